@@ -3,14 +3,136 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import re
+import threading
+import time
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Coroutine, TypeVar
+from weakref import WeakKeyDictionary
 
 import aiohttp
-from furl import furl
+from yarl import URL
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 MVGAPI_DEFAULT_LIMIT = 10  # API defaults to 10, limits to 100
+MVGAPI_MAX_LIMIT = 100
+MVGAPI_REFERENCE_TTL = 3600  # seconds to cache static reference data (ZDM)
+MVGAPI_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "mvg-hass",
+}
+
+_STATION_ID_RE = re.compile("de:[0-9]{2,5}:[0-9]+")
+
+_sessions: WeakKeyDictionary[
+    asyncio.AbstractEventLoop, tuple[aiohttp.ClientSession, AsyncGenerator[None, None]]
+] = WeakKeyDictionary()
+_sessions_lock = threading.Lock()
+_cache: dict[tuple[Base, Endpoint, frozenset], tuple[float, Any]] = {}
+_station_id_set: tuple[list[str], frozenset[str]] | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+_T = TypeVar("_T")
+
+
+async def _close_on_shutdown(
+    loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession
+) -> AsyncGenerator[None, None]:
+    """Close the session when the event loop shuts down its async generators."""
+    try:
+        yield
+    finally:
+        with _sessions_lock:
+            if (entry := _sessions.get(loop)) is not None and entry[0] is session:
+                del _sessions[loop]
+        await session.close()
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """
+    Return the client session of the running event loop, creating it on first use.
+
+    Every event loop gets its own session. It is closed by close_session() or, at the
+    latest, when the loop shuts down its async generators (e.g. at the end of
+    asyncio.run()), so sessions never outlive their loop.
+
+    :return: the shared client session
+    """
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(loop)
+    if entry is not None and not entry[0].closed:
+        return entry[0]
+
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75,
+        ),
+        timeout=aiohttp.ClientTimeout(total=30, connect=10),
+        headers=MVGAPI_HEADERS,
+    )
+    guard = _close_on_shutdown(loop, session)
+    with _sessions_lock:
+        _sessions[loop] = (session, guard)
+    # start the generator so the loop tracks it and closes it on shutdown
+    await guard.__anext__()
+    return session
+
+
+def _run(coro: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    All calls share one event loop running in a daemon thread, so the loop and the
+    client session are set up only once and calls from a running loop do not fail.
+
+    :param coro: the coroutine to run
+    :raises RuntimeError: raised if called from a coroutine on the shared loop itself
+    :return: the result of the coroutine
+    """
+    global _loop  # pylint: disable=global-statement
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mvgapi", daemon=True).start()
+            atexit.register(_stop_loop)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        coro.close()
+        raise RuntimeError("Synchronous MvgApi calls cannot be made from its own event loop")
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+def _stop_loop() -> None:
+    """Close the session of the shared event loop and stop the loop on exit."""
+    global _loop  # pylint: disable=global-statement
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_session(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+async def close_session() -> None:
+    """Close the client session of the running event loop if it is open."""
+    if (entry := _sessions.get(asyncio.get_running_loop())) is not None:
+        await entry[1].aclose()
 
 
 class Base(Enum):
@@ -49,15 +171,39 @@ class TransportType(Enum):
     UNKNOWN: tuple[str, str] = ("Unbekannt", "mdi:help-circle-outline")
 
     @classmethod
-    def all(cls) -> list[TransportType]:
-        """Return a list of all products."""
-        return [getattr(TransportType, c.name) for c in cls if c.name != "SEV"]
+    def all(cls) -> tuple[TransportType, ...]:
+        """Return a tuple of all products."""
+        return _ALL_TRANSPORT_TYPES
+
+
+_ALL_TRANSPORT_TYPES: tuple[TransportType, ...] = tuple(
+    t for t in TransportType if t.name != "SEV"
+)
+_ALL_TRANSPORT_TYPES_STR = ",".join(t.name for t in _ALL_TRANSPORT_TYPES)
+_TT_LOOKUP: dict[str, tuple[str, str]] = {t.name: t.value for t in TransportType}
+
+
+_BASE_URL: dict[Base, URL] = {base: URL(base.value) for base in Base}
 
 
 class MvgApiError(Exception):
     """Failed communication with MVG API."""
 
 
+def _station_ids_as_set(station_ids: list[str]) -> frozenset[str]:
+    """Return the station ids as a set, converted once per cached response."""
+    global _station_id_set  # pylint: disable=global-statement
+    if _station_id_set is None or _station_id_set[0] is not station_ids:
+        _station_id_set = (station_ids, frozenset(station_ids))
+    return _station_id_set[1]
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_format(station_id: str) -> bool:
+    """Check the format of a global station id, see MvgApi.valid_station_id."""
+    return _STATION_ID_RE.match(station_id) is not None
+
+
 class MvgApi:
     """A class interface to retrieve stations, lines and departures from the MVG.
 
@@ -71,7 +217,7 @@ class MvgApi:
 
     def __init__(self, station_id: str) -> None:
         """Initialize the MVG interface."""
-        self.station_id = station_id
+        self.station_id = station_id.strip()
 
     @staticmethod
     async def valid_station_id(station_id: str, validate_existence: bool = False) -> bool:
@@ -82,15 +228,16 @@ class MvgApi:
         :param validate_existence: validate the existence in a list from the API
         :return: True if valid, False if Invalid
         """
-        valid_format = bool(re.match("de:[0-9]{2,5}:[0-9]+", station_id))
-        if not valid_format:
+        if not _is_valid_format(station_id):
             return False
 
         if validate_existence:
             try:
-                result = await MvgApi.__api(Base.ZDM, Endpoint.ZDM_STATION_IDS)
+                result = await MvgApi.__api(
+                    Base.ZDM, Endpoint.ZDM_STATION_IDS, cache_ttl=MVGAPI_REFERENCE_TTL
+                )
                 assert isinstance(result, list)
-                return station_id in result
+                return station_id in _station_ids_as_set(result)
             except (AssertionError, KeyError) as exc:
                 raise MvgApiError("Bad API call: Could not parse station data") from exc
 
@@ -98,7 +245,10 @@ class MvgApi:
 
     @staticmethod
     async def __api(
-        base: Base, endpoint: Endpoint, args: dict[str, Any] | None = None
+        base: Base,
+        endpoint: Endpoint,
+        args: dict[str, Any] | None = None,
+        cache_ttl: float = 0,
     ) -> Any:
         """
         Call the API endpoint with the given arguments.
@@ -106,31 +256,39 @@ class MvgApi:
         :param base: the API base
         :param endpoint: the endpoint
         :param args: a dictionary containing arguments
+        :param cache_ttl: seconds to serve a cached response, defaults to 0 (no caching)
         :raises MvgApiError: raised on communication failure or unexpected result
         :return: the response as JSON object
         """
-        url = furl(base.value)
-        url /= endpoint.value[0]
-        url.set(query_params=args)
+        if cache_ttl > 0:
+            key = (base, endpoint, frozenset((args or {}).items()))
+            if (cached := _cache.get(key)) is not None:
+                timestamp, payload = cached
+                if time.monotonic() - timestamp < cache_ttl:
+                    return payload
+
+        url = (_BASE_URL[base] / endpoint.value[0].lstrip("/")).with_query(args)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url.url,
-                ) as resp:
-                    if resp.status != 200:
-                        raise MvgApiError(
-                            f"Bad API call: Got response ({resp.status}) from {url.url}"
-                        )
-                    if resp.content_type != "application/json":
-                        raise MvgApiError(
-                            f"Bad API call: Got content type {resp.content_type} from {url.url}"
-                        )
-                    return await resp.json()
+            session = await _get_session()
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    raise MvgApiError(
+                        f"Bad API call: Got response ({resp.status}) from {url}"
+                    )
+                content_type = resp.headers.get("Content-Type", "")
+                if not content_type.startswith("application/json"):
+                    raise MvgApiError(
+                        f"Bad API call: Got content type {content_type} from {url}"
+                    )
+                payload = json_loads(await resp.read())
+                if cache_ttl > 0:
+                    _cache[key] = (time.monotonic(), payload)
+                return payload
 
         except aiohttp.ClientError as exc:
             raise MvgApiError(
-                f"Bad API call: Got {str(type(exc))} from {url.url}"
+                f"Bad API call: Got {str(type(exc))} from {url}"
             ) from exc
 
     @staticmethod
@@ -142,7 +300,9 @@ class MvgApi:
         :return: station ids as a list
         """
         try:
-            result = await MvgApi.__api(Base.ZDM, Endpoint.ZDM_STATION_IDS)
+            result = await MvgApi.__api(
+                Base.ZDM, Endpoint.ZDM_STATION_IDS, cache_ttl=MVGAPI_REFERENCE_TTL
+            )
             assert isinstance(result, list)
             return sorted(result)
         except (AssertionError, KeyError) as exc:
@@ -153,11 +313,15 @@ class MvgApi:
         """
         Retrieve a list of all stations.
 
+        The list is cached for an hour and shared between callers, treat it as read-only.
+
         :raises MvgApiError: raised on communication failure or unexpected result
         :return: a list of stations as dictionary
         """
         try:
-            result = await MvgApi.__api(Base.ZDM, Endpoint.ZDM_STATIONS)
+            result = await MvgApi.__api(
+                Base.ZDM, Endpoint.ZDM_STATIONS, cache_ttl=MVGAPI_REFERENCE_TTL
+            )
             assert isinstance(result, list)
             return result
         except (AssertionError, KeyError) as exc:
@@ -171,18 +335,22 @@ class MvgApi:
         :raises MvgApiError: raised on communication failure or unexpected result
         :return: a list of stations as dictionary
         """
-        return asyncio.run(MvgApi.stations_async())
+        return _run(MvgApi.stations_async())
 
     @staticmethod
     async def lines_async() -> list[dict[str, Any]]:
         """
         Retrieve a list of all lines.
 
+        The list is cached for an hour and shared between callers, treat it as read-only.
+
         :raises MvgApiError: raised on communication failure or unexpected result
         :return: a list of lines as dictionary
         """
         try:
-            result = await MvgApi.__api(Base.ZDM, Endpoint.ZDM_LINES)
+            result = await MvgApi.__api(
+                Base.ZDM, Endpoint.ZDM_LINES, cache_ttl=MVGAPI_REFERENCE_TTL
+            )
             assert isinstance(result, list)
             return result
         except (AssertionError, KeyError) as exc:
@@ -196,7 +364,7 @@ class MvgApi:
         :raises MvgApiError: raised on communication failure or unexpected result
         :return: a list of lines as dictionary
         """
-        return asyncio.run(MvgApi.lines_async())
+        return _run(MvgApi.lines_async())
 
     @staticmethod
     async def station_async(query: str) -> dict[str, str] | None:
@@ -213,9 +381,9 @@ class MvgApi:
                 'latitude': 48.14003, 'longitude': 11.56107}
         """
         query = query.strip()
+        is_id = _is_valid_format(query)
         try:
-            args = dict.fromkeys(Endpoint.FIB_LOCATION.value[1])
-            args.update({"query": query.strip()})
+            args = {"query": query}
             result = await MvgApi.__api(Base.FIB, Endpoint.FIB_LOCATION, args)
             assert isinstance(result, list)
 
@@ -224,9 +392,9 @@ class MvgApi:
                 return None
 
             # return name and place from first result if station id was provided
-            if await MvgApi.valid_station_id(query):
+            if is_id:
                 station = {
-                    "id": query.strip(),
+                    "id": query,
                     "name": result[0]["name"],
                     "place": result[0]["place"],
                     "latitude": result[0]["latitude"],
@@ -266,7 +434,7 @@ class MvgApi:
             {'id': 'de:09162:6', 'name': 'Hauptbahnhof', 'place': 'München',
                 'latitude': 48.14003, 'longitude': 11.56107}
         """
-        return asyncio.run(MvgApi.station_async(query))
+        return _run(MvgApi.station_async(query))
 
     @staticmethod
     async def nearby_async(latitude: float, longitude: float) -> dict[str, str] | None:
@@ -284,8 +452,7 @@ class MvgApi:
                 'latitude': 48.15007, 'longitude': 11.581}
         """
         try:
-            args = dict.fromkeys(Endpoint.FIB_NEARBY.value[1])
-            args.update({"latitude": latitude, "longitude": longitude})
+            args = {"latitude": latitude, "longitude": longitude}
             result = await MvgApi.__api(Base.FIB, Endpoint.FIB_NEARBY, args)
             assert isinstance(result, list)
 
@@ -321,7 +488,7 @@ class MvgApi:
             {'id': 'de:09162:70', 'name': 'Universität', 'place': 'München',
                 'latitude': 48.15007, 'longitude': 11.581}
         """
-        return asyncio.run(MvgApi.nearby_async(latitude, longitude))
+        return _run(MvgApi.nearby_async(latitude, longitude))
 
     @staticmethod
     async def departures_async(
@@ -354,44 +521,38 @@ class MvgApi:
                 'messages': []
             }, ... ]
         """
-        station_id.strip()
-        if not await MvgApi.valid_station_id(station_id):
+        station_id = station_id.strip()
+        if not _is_valid_format(station_id):
             raise ValueError("Invalid format of global station id.")
 
         try:
-            args = dict.fromkeys(Endpoint.FIB_LOCATION.value[1])
-            args.update(
-                {"globalId": station_id, "offsetInMinutes": offset, "limit": limit}
-            )
-            if transport_types is None:
-                transport_types = TransportType.all()
-            args.update(
-                {
-                    "transportTypes": ",".join(
-                        [product.name for product in transport_types]
-                    )
-                }
-            )
+            args = {
+                "globalId": station_id,
+                "offsetInMinutes": offset,
+                "limit": limit,
+                "transportTypes": _ALL_TRANSPORT_TYPES_STR
+                if transport_types is None
+                else ",".join([product.name for product in transport_types]),
+            }
             result = await MvgApi.__api(Base.FIB, Endpoint.FIB_DEPARTURE, args)
             assert isinstance(result, list)
 
-            departures: list[dict[str, Any]] = []
-            for departure in result:
-                departures.append(
-                    {
-                        "time": int(departure["realtimeDepartureTime"] / 1000),
-                        "planned": int(departure["plannedDepartureTime"] / 1000),
-                        "platform": departure.get("platform"),
-                        "realtime": departure["realtime"],
-                        "line": departure["label"],
-                        "destination": departure["destination"],
-                        "type": TransportType[departure["transportType"]].value[0],
-                        "icon": TransportType[departure["transportType"]].value[1],
-                        "cancelled": departure["cancelled"],
-                        "messages": departure["messages"],
-                        "stopPointGlobalId": departure["stopPointGlobalId"],
-                    }
-                )
+            departures: list[dict[str, Any]] = [
+                {
+                    "time": departure["realtimeDepartureTime"] // 1000,
+                    "planned": departure["plannedDepartureTime"] // 1000,
+                    "platform": departure.get("platform"),
+                    "realtime": departure["realtime"],
+                    "line": departure["label"],
+                    "destination": departure["destination"],
+                    "type": (transport := _TT_LOOKUP[departure["transportType"]])[0],
+                    "icon": transport[1],
+                    "cancelled": departure["cancelled"],
+                    "messages": departure["messages"],
+                    "stopPointGlobalId": departure["stopPointGlobalId"],
+                }
+                for departure in result
+            ]
             return departures
 
         except (AssertionError, KeyError) as exc:
@@ -426,7 +587,7 @@ class MvgApi:
             }, ... ]
 
         """
-        return asyncio.run(
+        return _run(
             self.departures_async(self.station_id, limit, offset, transport_types)
         )
 
@@ -481,4 +642,4 @@ class MvgApi:
         :raises MvgApiError: raised on communication failure oder unexpected result
         :return: a list of messages as dictionary
         """
-        return asyncio.run(MvgApi.messages_async())
+        return _run(MvgApi.messages_async())
@@ -1,17 +1,24 @@
 """Support for departure information for public transport in Munich."""
 from __future__ import annotations
 
-from copy import deepcopy
-from datetime import datetime, timedelta
+import asyncio
+from datetime import timedelta
 import logging
+import time
 
-from .mvgapi import MvgApi, TransportType
+from .mvgapi import (
+    MVGAPI_MAX_LIMIT,
+    MvgApi,
+    MvgApiError,
+    TransportType,
+    close_session,
+)
 import voluptuous as vol
 
 from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
 from homeassistant.components.sensor.const import SensorStateClass
-from homeassistant.const import CONF_NAME, UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_NAME, EVENT_HOMEASSISTANT_STOP, UnitOfTime
+from homeassistant.core import Event, HomeAssistant
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
@@ -29,10 +36,16 @@ CONF_NUMBER = "number"
 
 NONE_ICON = "mdi:clock"
 
+# departures to request per wanted departure when filtering by destination or line
+FILTER_OVERFETCH = 4
+
 ATTRIBUTION = "Data provided by mvg.de"
 
 SCAN_INTERVAL = timedelta(seconds=30)
 
+# sensors of one station updating within this time share a single API fetch
+STATION_CACHE_TTL = SCAN_INTERVAL.total_seconds() / 2
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_NEXT_DEPARTURE): [
@@ -56,16 +69,33 @@ async def async_setup_platform(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the MVGLive sensor."""
+
+    async def _async_close_session(event: Event) -> None:
+        """Close the shared MVG API session on shutdown."""
+        await close_session()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_session)
+
     sensors = []
-    for nextdeparture in config[CONF_NEXT_DEPARTURE]:
+    stations: dict[str, MVGStationData] = {}
+    stations_metadata = await asyncio.gather(
+        *[
+            MvgApi.station_async(nextdeparture.get(CONF_STATION))
+            for nextdeparture in config[CONF_NEXT_DEPARTURE]
+        ]
+    )
+    for nextdeparture, station_metadata in zip(
+        config[CONF_NEXT_DEPARTURE], stations_metadata
+    ):
         station_name = nextdeparture.get(CONF_STATION)
-        station_metadata = await MvgApi.station_async(station_name)
         if station_metadata is None:
             raise ConfigEntryError(f"Invalid station name: {station_name}")
-        api = MvgApi(station_metadata["id"])
+        station_id = station_metadata["id"]
+        if station_id not in stations:
+            stations[station_id] = MVGStationData(MvgApi(station_id))
         sensors.append(
             MVGSensor(
-                api,
+                stations[station_id],
                 station_metadata["name"],
                 nextdeparture.get(CONF_DESTINATIONS),
                 nextdeparture.get(CONF_LINES),
@@ -87,7 +117,7 @@ class MVGSensor(SensorEntity):
 
     def __init__(
         self,
-        api,
+        station,
         station_name,
         destinations,
         lines,
@@ -97,10 +127,10 @@ class MVGSensor(SensorEntity):
         name,
     ):
         """Initialize the sensor."""
-        self._api = api
+        self._station = station
         self._station_name = station_name
         self._name = name
-        self.data = MVGData(api, destinations, lines, products, timeoffset, number)
+        self.data = MVGData(station, destinations, lines, products, timeoffset, number)
         self._state = None
         self._icon = NONE_ICON
 
@@ -121,9 +151,9 @@ class MVGSensor(SensorEntity):
         """Return the state attributes."""
         if not (dep := self.data.departures):
             return None
-        attr = dep[0]  # next departure attributes
-        attr["departures"] = deepcopy(dep)  # all departures dictionary
-        attr["messages"] = deepcopy(self.data.messages)  # all messages dictionary
+        attr = dep[0].copy()  # next departure attributes
+        attr["departures"] = [d.copy() for d in dep]  # all departures dictionary
+        attr["messages"] = list(self.data.messages)  # all messages dictionary
         return attr
 
     @property
@@ -141,63 +171,89 @@ class MVGSensor(SensorEntity):
             self._state = self.data.departures[0].get("time_in_mins", "-")
             self._icon = self.data.departures[0]["icon"]
 
-def _get_minutes_until_departure(departure_time: int) -> int:
-    """Calculate the time difference in minutes between the current time and a given departure time.
-    Args:
-        departure_time: Unix timestamp of the departure time, in seconds.
-    Returns:
-        The time difference in minutes, as a float.
-    """
-    current_time = datetime.now()
-    departure_datetime = datetime.fromtimestamp(departure_time)
-    time_difference = (departure_datetime - current_time).total_seconds()
-    minutes_difference = int(time_difference / 60.0)
-    return minutes_difference
-
 class MVGData:
     """Pull data from the mvg.de web page."""
-    def __init__(self, api, destinations, lines, products, timeoffset, number):
+
+    __slots__ = (
+        "_destinations",
+        "_lines",
+        "_any_destination",
+        "_any_line",
+        "_transport_types",
+        "_types",
+        "_timeoffset",
+        "_number",
+        "_limit",
+        "station",
+        "departures",
+        "messages",
+    )
+
+    def __init__(self, station, destinations, lines, products, timeoffset, number):
         """Initialize the sensor."""
-        self._destinations = destinations
-        self._lines = lines
-        self._products = products
+        self._destinations = frozenset(destinations or ())
+        self._lines = frozenset(lines or ())
+        # an empty filter or the default [""] accepts every destination or line
+        self._any_destination = self._destinations <= {""}
+        self._any_line = self._lines <= {""}
+        self._transport_types = (
+            [
+                transport_type
+                for transport_type in TransportType
+                if transport_type.value[0] in products
+            ]
+            if products
+            else None
+        )
+        self._types = frozenset(t.value[0] for t in self._transport_types or ())
         self._timeoffset = timeoffset
         self._number = number
-        self.mvg = api
+        # fetch more departures if some of them are filtered out locally
+        if self._any_destination and self._any_line:
+            self._limit = number
+        else:
+            self._limit = min(MVGAPI_MAX_LIMIT, number * FILTER_OVERFETCH)
+        self.station = station
+        self.station.register(self._timeoffset, self._limit, self._transport_types)
         self.departures = []
+        self.messages = []
 
     async def update(self):
         """Update the connection data."""
-        try:
-            _departures = await self.mvg.departures_async(
-                station_id=self.mvg.station_id,
-                offset=self._timeoffset,
-                limit=self._number,
-                transport_types=[
-                    transport_type
-                    for transport_type in TransportType
-                    if transport_type.value[0] in self._products
-                ]
-                if self._products
-                else None,
-            )
-        except ValueError:
+        await self.station.update()
+        _departures = self.station.departures
+        _messages = self.station.messages
+        if isinstance(_departures, ValueError):
             self.departures = []
             _LOGGER.warning("Returned data not understood")
             return
+        if isinstance(_departures, BaseException):
+            # the fetch is shared, do not re-raise the same exception instance
+            raise MvgApiError("Failed to retrieve departures") from _departures
         self.departures = []
+        now = time.time()
         for _departure in _departures:
+            if len(self.departures) >= self._number:
+                break
+
             # find the first departure meeting the criteria
             if (
-                "" not in self._destinations[:1]
+                self._transport_types is not None
+                and _departure["type"] not in self._types
+            ):
+                continue
+
+            if (
+                not self._any_destination
                 and _departure["destination"] not in self._destinations
             ):
                 continue
 
-            if "" not in self._lines[:1] and _departure["line"] not in self._lines:
+            if not self._any_line and _departure["line"] not in self._lines:
                 continue
 
-            time_to_departure = _get_minutes_until_departure(_departure["time"])
+            # minutes until departure, both timestamps are unix seconds
+            time_to_departure = int((_departure["time"] - now) / 60)
 
             if time_to_departure < self._timeoffset:
                 continue
@@ -209,5 +265,85 @@ class MVGData:
             _nextdep["time_in_mins"] = time_to_departure
             self.departures.append(_nextdep)
 
-        # Fetch messages and store them in the data object
-        self.messages = await self.mvg.messages_async()
+        # store the messages fetched alongside the departures
+        if isinstance(_messages, BaseException):
+            raise MvgApiError("Failed to retrieve messages") from _messages
+        self.messages = _messages
+
+
+class MVGStationData:
+    """Pull departures and messages of one station once for all its sensors."""
+
+    __slots__ = (
+        "mvg",
+        "_lock",
+        "_offset",
+        "_limit",
+        "_transport_types",
+        "_request_types",
+        "_filters",
+        "_timestamp",
+        "departures",
+        "messages",
+    )
+
+    def __init__(self, api):
+        """Initialize the station data."""
+        self.mvg = api
+        self._lock = asyncio.Lock()
+        self._offset = None
+        self._limit = 0
+        self._transport_types = set()
+        self._request_types = []
+        self._filters = set()
+        self._timestamp = float("-inf")
+        self.departures = []
+        self.messages = []
+
+    def register(self, timeoffset, limit, transport_types):
+        """Widen the request so it covers the departures a sensor needs."""
+        self._filters.add(
+            (timeoffset, None if transport_types is None else frozenset(transport_types))
+        )
+        if self._offset is None or timeoffset < self._offset:
+            self._offset = timeoffset
+        self._limit = max(self._limit, limit)
+        if len(self._filters) > 1:
+            # sensors drop departures outside their own offset and products locally
+            self._limit = MVGAPI_MAX_LIMIT
+        if transport_types is None or self._transport_types is None:
+            self._transport_types = None
+        else:
+            self._transport_types.update(transport_types)
+        # keep the enum order of the transport types requested from the API
+        self._request_types = (
+            [
+                transport_type
+                for transport_type in TransportType
+                if transport_type in self._transport_types
+            ]
+            if self._transport_types is not None
+            else None
+        )
+
+    async def update(self):
+        """Update the departures and messages unless they are still fresh.
+
+        Results are stored as returned by asyncio.gather, i.e. either the data or
+        the exception raised while fetching it.
+        """
+        async with self._lock:
+            if time.monotonic() - self._timestamp < STATION_CACHE_TTL:
+                return
+            # departures and messages are independent, fetch them concurrently
+            self.departures, self.messages = await asyncio.gather(
+                self.mvg.departures_async(
+                    station_id=self.mvg.station_id,
+                    offset=self._offset or 0,
+                    limit=self._limit,
+                    transport_types=self._request_types,
+                ),
+                self.mvg.messages_async(),
+                return_exceptions=True,
+            )
+            self._timestamp = time.monotonic()